@@ -4,6 +4,7 @@ within a single gene.
 
 import os
 import sys
+import csv
 import asyncio
 import argparse
 import logging
@@ -12,6 +13,7 @@ from denovonear.rate_limiter import RateLimiter
 from denovonear.load_mutation_rates import load_mutation_rates
 from denovonear.load_de_novos import load_de_novos
 from denovonear.cluster_test import cluster_de_novos
+from denovonear.weights import stop_simulations
 
 from denovonear.load_gene import (construct_gene_object,
     count_de_novos_per_transcript, minimise_transcripts)
@@ -23,29 +25,55 @@ async def clustering(ensembl, mut_dict, output, args):
     
     de_novos = load_de_novos(args.input)
     
-    output.write("gene_id\tmutation_category\tevents_n\tdist\tprobability\n")
+    writer = csv.writer(output, delimiter='\t', lineterminator='\n')
+    writer.writerow(['gene_id', 'mutation_category', 'events_n', 'dist', 'probability'])
     
     iterations = 1000000
-    for symbol in sorted(de_novos):
-        
-        if len(de_novos[symbol]["missense"] + de_novos[symbol]["nonsense"]) < 2:
-            continue
-        
-        probs = await cluster_de_novos(symbol, de_novos[symbol], ensembl, iterations, mut_dict)
-        
-        if probs is None:
-            continue
-        
-        output.write("{}\t{}\t{}\t{}\t{}\n".format(symbol, "missense",
-            len(de_novos[symbol]["missense"]), probs["miss_dist"], probs["miss_prob"]))
-        output.write("{}\t{}\t{}\t{}\t{}\n".format(symbol, "nonsense",
-            len(de_novos[symbol]["nonsense"]), probs["nons_dist"], probs["nons_prob"]))
+    symbols = [ x for x in sorted(de_novos) if
+        len(de_novos[x]["missense"] + de_novos[x]["nonsense"]) > 1 ]
+    
+    # analyse genes concurrently, so that requests to ensembl for one gene can
+    # overlap with simulations for other genes. Each gene runs its missense and
+    # nonsense simulations in parallel, with one thread each, so limit the
+    # genes in flight to half the cores. This also bounds memory use.
+    limit = asyncio.Semaphore(max(1, (os.cpu_count() or 1) // 2))
+    async def analyse(symbol):
+        async with limit:
+            return await cluster_de_novos(symbol, de_novos[symbol], ensembl,
+                iterations, mut_dict, threads=1)
+    
+    tasks = [ asyncio.ensure_future(analyse(x)) for x in symbols ]
+    
+    # write results in sorted order, as soon as each gene finishes
+    try:
+        for symbol, task in zip(symbols, tasks):
+            probs = await task
+            
+            if probs is None:
+                continue
+            
+            writer.writerows([
+                [symbol, "missense", len(de_novos[symbol]["missense"]),
+                    probs["miss_dist"], probs["miss_prob"]],
+                [symbol, "nonsense", len(de_novos[symbol]["nonsense"]),
+                    probs["nons_dist"], probs["nons_prob"]]])
+    finally:
+        # if a gene raised an error, don't leave the other genes running
+        # unattended. Cancelling a task doesn't interrupt a simulation already
+        # running in another thread, so also ask the simulations to stop, or
+        # the program would wait for them to finish before exiting.
+        if not all(x.done() for x in tasks):
+            stop_simulations()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 async def find_transcripts(ensembl, mut_dict, output, args):
     
     de_novos = load_de_novos(args.de_novos)
     
-    output.write("hgnc_symbol\ttranscript_id\tlength\tde_novos\n")
+    writer = csv.writer(output, delimiter='\t', lineterminator='\n')
+    writer.writerow(['hgnc_symbol', 'transcript_id', 'length', 'de_novos'])
     
     for symbol in sorted(de_novos):
         print(symbol)
@@ -64,10 +92,8 @@ async def find_transcripts(ensembl, mut_dict, output, args):
             continue
         
         # write the transcript details to a file
-        for key in counts:
-            line = "{}\t{}\t{}\t{}\n".format(symbol, key, counts[key]["len"],
-                counts[key]["n"])
-            output.write(line)
+        writer.writerows([symbol, key, counts[key]["len"], counts[key]["n"]]
+            for key in counts)
 
 def load_genes(path):
     """ load a file listing gene and transcript IDs
@@ -81,14 +107,13 @@ def load_genes(path):
         dict of transcripts eg {'CTC1': ["ENST00000315684", "ENST00000485511"]}
     """
     
-    with open(path, 'rt') as f:
-        lines = [ x.split('\t')[:2] for x in f if not x.startswith('hgnc') ]
-    
     transcripts = {}
-    for symbol, tx in lines:
-        if symbol not in transcripts:
-            transcripts[symbol] = []
-        transcripts[symbol].append(tx)
+    with open(path, 'rt') as f:
+        for line in f:
+            if line.startswith('hgnc'):
+                continue
+            symbol, tx = line.split('\t')[:2]
+            transcripts.setdefault(symbol, []).append(tx)
     
     return transcripts
 
@@ -1,4 +1,6 @@
 
+import asyncio
+import random
 from math import log, isnan
 
 from scipy.stats import chi2
@@ -28,7 +30,8 @@ def fishers_method(values):
     # P-values. The chi square statistic is -2*sum(ln(P-values))
     return chi2.sf(-2 * sum(map(log, values)), 2 * len(values))
 
-async def cluster_de_novos(symbol, de_novos, ensembl, iterations=1000000, mut_dict=None):
+async def cluster_de_novos(symbol, de_novos, ensembl, iterations=1000000,
+        mut_dict=None, threads=1, seed=None):
     """ analysis proximity cluster of de novos in a single gene
     
     Args:
@@ -38,6 +41,9 @@ async def cluster_de_novos(symbol, de_novos, ensembl, iterations=1000000, mut_di
         iterations: number of simulations to run
         ensembl: EnsemblRequest object, for obtaing info from ensembl
         mut_dict: dictionary of mutation rates, indexed by trinuclotide sequence
+        threads: number of threads for each of the missense and nonsense
+            simulations. These already run in parallel with each other.
+        seed: optional seed, to make the simulated P values reproducible
     
     Returns:
         a dictionary containing P values, and distances for missense, nonsense,
@@ -47,6 +53,11 @@ async def cluster_de_novos(symbol, de_novos, ensembl, iterations=1000000, mut_di
     if mut_dict is None:
         mut_dict = load_mutation_rates()
     
+    # derive separate seeds for each simulation from the gene's seed
+    seeds = random.Random(seed)
+    def next_seed():
+        return None if seed is None else seeds.getrandbits(32)
+    
     missense = de_novos["missense"]
     nonsense = de_novos["nonsense"]
     
@@ -67,10 +78,20 @@ async def cluster_de_novos(symbol, de_novos, ensembl, iterations=1000000, mut_di
         missense_events = get_de_novos_in_transcript(transcript, missense)
         nonsense_events = get_de_novos_in_transcript(transcript, nonsense)
         
-        rates = SiteRates(transcript, mut_dict)
+        # only build the site rates if there are enough de novos to test, as
+        # get_p_value() doesn't use the rates for fewer than two de novos
+        rates = None
+        if len(missense_events) > 1 or len(nonsense_events) > 1:
+            rates = SiteRates(transcript, mut_dict)
         
-        (miss_dist, miss_prob) = get_p_value(transcript, rates, iterations, "missense", missense_events)
-        (nons_dist, nons_prob) = get_p_value(transcript, rates, iterations, "lof", nonsense_events)
+        # the simulations release the GIL, so run the missense and nonsense
+        # simulations in parallel threads
+        loop = asyncio.get_event_loop()
+        (miss_dist, miss_prob), (nons_dist, nons_prob) = await asyncio.gather(
+            loop.run_in_executor(None, get_p_value, transcript, rates,
+                iterations, "missense", missense_events, threads, next_seed()),
+            loop.run_in_executor(None, get_p_value, transcript, rates,
+                iterations, "lof", nonsense_events, threads, next_seed()))
         
         dists["miss_dist"].append(miss_dist)
         dists["nons_dist"].append(nons_dist)
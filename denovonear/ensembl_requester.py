@@ -118,6 +118,51 @@ async def get_protein_seq_for_transcript(ensembl, transcript_id, build='grch37')
     resp = await ensembl.get(url, headers)
     return resp.decode('utf8')
 
+async def get_protein_seqs_for_transcripts(ensembl, transcript_ids, build='grch37'):
+    """ obtain protein sequences for many transcripts with batched requests
+    
+    Ensembl accepts up to 50 IDs per POST request, so this needs far fewer
+    requests than fetching each transcript individually. Sequences are cached
+    under the same urls as get_protein_seq_for_transcript(), so only
+    transcripts missing from the cache are requested.
+    
+    Returns:
+        dictionary of protein sequences, indexed by transcript ID. Transcripts
+        without a protein sequence are omitted.
+    """
+    headers = {"content-type": "application/json", "accept": "application/json"}
+    url = f'{get_base_url(build)}/sequence/id?type=protein'
+    get_url = lambda x: f'{get_base_url(build)}/sequence/id/{x}?type=protein'
+    
+    seqs = {}
+    missing = []
+    for tx_id in transcript_ids:
+        cached = ensembl.get_cached(get_url(tx_id))
+        if cached is not None:
+            seqs[tx_id] = cached.decode('utf8')
+        else:
+            missing.append(tx_id)
+    
+    batch_size = 50
+    batches = [ missing[i:i + batch_size]
+        for i in range(0, len(missing), batch_size) ]
+    tasks = [ ensembl.post(url, {"ids": x}, headers) for x in batches ]
+    
+    for batch, resp in zip(batches, await asyncio.gather(*tasks, return_exceptions=True)):
+        if isinstance(resp, Exception):
+            # if a batch fails, request its transcripts individually, so one
+            # problematic transcript doesn't remove the others
+            tasks = [ get_protein_seq_for_transcript(ensembl, x, build) for x in batch ]
+            resp = await asyncio.gather(*tasks, return_exceptions=True)
+            seqs.update({k: v for k, v in zip(batch, resp) if isinstance(v, str)})
+            continue
+        
+        for item in json.loads(resp):
+            seqs[item["query"]] = item["seq"]
+            ensembl.set_cached(get_url(item["query"]), item["seq"].encode('utf8'))
+    
+    return seqs
+
 async def get_ranges_for_tx(ensembl, transcript_id, feature, build='grch37'):
     """ get coordinates for exons (just cds or full exonic)
     """
@@ -3,14 +3,14 @@
 
 from __future__ import print_function, division
 
-missense = ["missense_variant", "stop_lost", "inframe_deletion",
-    "inframe_insertion", "coding_sequence_variant", "protein_altering_variant"]
+missense = {"missense_variant", "stop_lost", "inframe_deletion",
+    "inframe_insertion", "coding_sequence_variant", "protein_altering_variant"}
 
-lof = ["stop_gained", "splice_acceptor_variant",
+lof = {"stop_gained", "splice_acceptor_variant",
     "splice_donor_variant", "frameshift_variant", "initiator_codon_variant",
-    "start_lost", "conserved_exon_terminus_variant"]
+    "start_lost", "conserved_exon_terminus_variant"}
     
-synonymous = ["synonymous_variant"]
+synonymous = {"synonymous_variant"}
 
 def load_de_novos(path, exclude_indels=True):
     """ load mutations into dict indexed by HGNC ID.
@@ -35,11 +35,8 @@ def load_de_novos(path, exclude_indels=True):
         header = handle.readline().strip().split("\t")
         for line in handle:
             
-            line = line.rstrip().split("\t")
-            gene = line[0]
-            position = int(line[2]) - 1
-            consequence = line[3]
-            var_type = line[4]
+            gene, _, position, consequence, var_type = line.rstrip().split("\t")[:5]
+            position = int(position) - 1
             
             # ignore indels (some splice_acceptor_variants (in the
             # functional_consequences) are indels
@@ -53,6 +50,7 @@ def load_de_novos(path, exclude_indels=True):
             if gene not in genes:
                 genes[gene] = {"missense": [], "nonsense": []}
             
+            # the consequence groups are sets, for quick membership checks
             if consequence in missense:
                 genes[gene]["missense"].append(position)
             elif consequence in lof:
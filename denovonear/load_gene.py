@@ -5,7 +5,7 @@ import asyncio
 
 from denovonear.transcript import Transcript
 
-from denovonear.ensembl_requester import (get_protein_seq_for_transcript,
+from denovonear.ensembl_requester import (get_protein_seqs_for_transcripts,
     get_genomic_seq_for_transcript, get_cds_seq_for_transcript,
     get_cds_ranges_for_transcript, get_exon_ranges_for_transcript,
     get_genes_for_hgnc_id, get_transcript_ids_for_ensembl_gene_id,
@@ -20,20 +20,15 @@ async def get_transcript_lengths(ensembl, transcript_ids):
         transcript_ids: list of transcript IDs for a single gene
     
     Returns:
-        dictionary of lengths (in amino acids), indexed by transcript IDs
+        dictionary of lengths (in amino acids), indexed by transcript IDs, and
+        ordered from longest to shortest (ties ordered by transcript ID).
     """
-    tasks = [get_protein_seq_for_transcript(ensembl, x) for x in transcript_ids]
-    seqs = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # associate tx_ids to the protein sequences, but remove failures
-    transcripts = dict(zip(transcript_ids, seqs))
-    for key in list(transcripts.keys()):
-        if not isinstance(transcripts[key], str):
-            del transcripts[key]
-        else:
-            transcripts[key] = len(transcripts[key])
-    
-    return transcripts
+    seqs = await get_protein_seqs_for_transcripts(ensembl, transcript_ids)
+    
+    # sort once here, so that transcripts with equal de novo counts and
+    # lengths are always picked in the same order downstream
+    lengths = sorted((-len(seqs[x]), x) for x in set(transcript_ids) if x in seqs)
+    return {x: -length for length, x in lengths}
 
 async def construct_gene_object(ensembl, transcript_id):
     """ creates an Transcript object for a gene from ensembl databases
@@ -76,16 +71,19 @@ def get_de_novos_in_transcript(transcript, de_novos):
         list of de novo positions found within the transcript
     """
     
+    # the CDS length is the same for every de novo, so only find it once
+    cds_length = transcript.get_coding_distance(transcript.get_cds_end())['pos']
+    
     in_transcript = []
     for de_novo in de_novos:
         # we check if the de novo is within the transcript by converting the
         # chromosomal position to a CDS-based position. Variants outside the CDS
-        # will raise an error, which we catch and pass on. It's better to do
-        # this, rather than use the function in_coding_region(), since that
-        # function does not allow for splice site variants.
+        # get positions outside the CDS range, so we check the range rather
+        # than relying on an error. It's better to do this, rather than use the
+        # function in_coding_region(), since that function does not allow for
+        # splice site variants.
         site = transcript.get_coding_distance(de_novo)
-        cds_length = transcript.get_coding_distance(transcript.get_cds_end())
-        within_cds = site['pos'] >= 0 and site['pos'] < cds_length['pos']
+        within_cds = site['pos'] >= 0 and site['pos'] < cds_length
         if within_cds and (transcript.in_coding_region(de_novo) or abs(site['offset']) < 9):
             in_transcript.append(de_novo)
     
@@ -125,7 +123,7 @@ async def get_transcript_ids(ensembl, symbol):
     
     return await get_transcript_lengths(ensembl, transcript_ids)
 
-async def load_gene(ensembl, gene_id, de_novos=[]):
+async def load_gene(ensembl, gene_id, de_novos=None):
     """ sort out all the necessary sequences and positions for a gene
     
     Args:
@@ -138,29 +136,32 @@ async def load_gene(ensembl, gene_id, de_novos=[]):
         list of Transcript objects for gene, including genomic ranges and sequences
     """
     
-    transcripts = await minimise_transcripts(ensembl, gene_id, de_novos)
+    if de_novos is None:
+        de_novos = []
     
     genes = []
-    for transcript_id in transcripts:
-        gene = await construct_gene_object(ensembl, transcript_id)
-        genes.append(gene)
+    if len(de_novos) > 0:
+        # reuse the Transcript objects constructed while picking transcripts
+        lengths, constructed = await get_gene_transcripts(ensembl, gene_id)
+        transcripts = pick_minimal_transcripts(lengths, constructed, de_novos)
+        genes = [ constructed[x] for x in transcripts ]
     
     if len(genes) == 0:
         raise IndexError("{0}: no suitable transcripts".format(gene_id))
     
     return genes
     
-async def count_de_novos_per_transcript(ensembl, gene_id, de_novos=[]):
-    """ count de novos in transcripts for a gene.
+async def get_gene_transcripts(ensembl, gene_id):
+    """ construct Transcript objects for all the coding transcripts of a gene
     
     Args:
         ensembl: EnsemblRequest object to request data from ensembl
         gene_id: HGNC symbol for gene
-        de_novos: list of de novo positions, so we can check they all fit in
-            the gene transcript
-        
+    
     Returns:
-        dictionary of lengths and de novo counts, indexed by transcript IDs.
+        tuple of (dictionary of transcript lengths, dictionary of Transcript
+        objects), both indexed by transcript ID. Transcripts which could not be
+        constructed are excluded from the Transcript dictionary.
     """
     
     transcripts = await get_transcript_ids(ensembl, gene_id)
@@ -169,33 +170,69 @@ async def count_de_novos_per_transcript(ensembl, gene_id, de_novos=[]):
     if len(transcripts) == 0:
         raise IndexError("{0} lacks coding transcripts".format(gene_id))
     
-    # count the de novos observed in all transcripts
+    # construct all the transcripts concurrently, rather than one at a time
+    tasks = [construct_gene_object(ensembl, x) for x in transcripts]
+    genes = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    constructed = {}
+    for key, gene in zip(transcripts, genes):
+        if isinstance(gene, ValueError):
+            continue
+        elif isinstance(gene, Exception):
+            raise gene
+        constructed[key] = gene
+    
+    return transcripts, constructed
+
+def count_de_novos(lengths, genes, de_novos):
+    """ count de novos in already constructed transcripts
+    
+    Args:
+        lengths: dictionary of transcript lengths, indexed by transcript ID
+        genes: dictionary of Transcript objects, indexed by transcript ID
+        de_novos: list of de novo positions
+    
+    Returns:
+        dictionary of lengths and de novo counts, indexed by transcript IDs.
+    """
+    
     counts = {}
-    for key in transcripts:
-        try:
-            gene = await construct_gene_object(ensembl, key)
-            total = len(get_de_novos_in_transcript(gene, de_novos))
-            if total > 0:
-                counts[key] = {}
-                counts[key]["n"] = total
-                counts[key]["len"] = transcripts[key]
-        except ValueError:
-            pass
+    for key, gene in genes.items():
+        total = len(get_de_novos_in_transcript(gene, de_novos))
+        if total > 0:
+            counts[key] = {}
+            counts[key]["n"] = total
+            counts[key]["len"] = lengths[key]
     
     return counts
 
-async def minimise_transcripts(ensembl, gene_id, de_novos):
-    """ get a set of minimal transcripts to contain all the de novos.
-    
-    We identify the minimal number of transcripts to contain all de novos. This
-    allows for de novos on mutually exclusive transcripts. The transcripts are
-    selected on the basis of containing the most number of de novos, while also
-    being the longest possible transcript for the gene.
+async def count_de_novos_per_transcript(ensembl, gene_id, de_novos=None):
+    """ count de novos in transcripts for a gene.
     
     Args:
         ensembl: EnsemblRequest object to request data from ensembl
         gene_id: HGNC symbol for gene
-        de_novos: set of de novo positions
+        de_novos: list of de novo positions, so we can check they all fit in
+            the gene transcript
+        
+    Returns:
+        dictionary of lengths and de novo counts, indexed by transcript IDs.
+    """
+    
+    if de_novos is None:
+        de_novos = []
+    
+    lengths, genes = await get_gene_transcripts(ensembl, gene_id)
+    
+    return count_de_novos(lengths, genes, de_novos)
+
+def pick_minimal_transcripts(lengths, genes, de_novos):
+    """ recursively pick transcripts until all the de novos are contained
+    
+    Args:
+        lengths: dictionary of transcript lengths, indexed by transcript ID
+        genes: dictionary of Transcript objects, indexed by transcript ID
+        de_novos: list of de novo positions
     
     Returns:
         dictionary of lengths and de novo counts, indexed by transcript ID for
@@ -205,7 +242,7 @@ async def minimise_transcripts(ensembl, gene_id, de_novos):
     if len(de_novos) == 0:
         return {}
     
-    counts = await count_de_novos_per_transcript(ensembl, gene_id, de_novos)
+    counts = count_de_novos(lengths, genes, de_novos)
     
     if len(counts) == 0:
         return {}
@@ -220,7 +257,7 @@ async def minimise_transcripts(ensembl, gene_id, de_novos):
     max_transcripts = {x: counts[x] for x in counts if x in tx_ids}
     
     # find which de novos occur in the transcript with the most de novos
-    gene = await construct_gene_object(ensembl, next(iter(max_transcripts)))
+    gene = genes[next(iter(max_transcripts))]
     denovos_in_gene = get_de_novos_in_transcript(gene, de_novos)
     
     # trim the de novos to the ones not in the current transcript
@@ -228,7 +265,34 @@ async def minimise_transcripts(ensembl, gene_id, de_novos):
     
     # and recursively return the transcripts in the current transcript, along
     # with transcripts for the reminaing de novos
-    update = await minimise_transcripts(ensembl, gene_id, leftovers)
-    max_transcripts.update(update)
+    max_transcripts.update(pick_minimal_transcripts(lengths, genes, leftovers))
     
     return max_transcripts
+
+async def minimise_transcripts(ensembl, gene_id, de_novos):
+    """ get a set of minimal transcripts to contain all the de novos.
+    
+    We identify the minimal number of transcripts to contain all de novos. This
+    allows for de novos on mutually exclusive transcripts. The transcripts are
+    selected on the basis of containing the most number of de novos, while also
+    being the longest possible transcript for the gene.
+    
+    The gene's transcripts are constructed once, then reused while picking
+    transcripts for the remaining de novos.
+    
+    Args:
+        ensembl: EnsemblRequest object to request data from ensembl
+        gene_id: HGNC symbol for gene
+        de_novos: set of de novo positions
+    
+    Returns:
+        dictionary of lengths and de novo counts, indexed by transcript ID for
+        the set of minimal transcripts necessary to contain all de novos.
+    """
+    
+    if len(de_novos) == 0:
+        return {}
+    
+    lengths, genes = await get_gene_transcripts(ensembl, gene_id)
+    
+    return pick_minimal_transcripts(lengths, genes, de_novos)
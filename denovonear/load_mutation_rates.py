@@ -1,11 +1,31 @@
 """ load trincleotide mutation rates
 """
 
+import functools
+
 from pkg_resources import resource_filename
 
+@functools.lru_cache()
+def _read_rates(path):
+    """ parse a mutation rates table, cached so each file is only read once
+    """
+    
+    rates = []
+    with open(path) as handle:
+        for line in handle:
+            if line.startswith("from"): # ignore the header line
+                continue
+            
+            rates.append(tuple( x.encode('utf8') for x in line.strip().split() ))
+    
+    return tuple(rates)
+
 def load_mutation_rates(path=None):
     """ load sequence context-based mutation rates
     
+    The parsed table is cached per path, since this is called for every gene
+    when rates aren't passed in to cluster_de_novos().
+    
     Args:
         path: path to table of sequence context-based mutation rates. If None,
             this defaults to per-trinucleotide rates provided by Kaitlin Samocha
@@ -18,13 +38,4 @@ def load_mutation_rates(path=None):
     if path is None:
         path = resource_filename(__name__, "data/rates.txt")
     
-    rates = []
-    with open(path) as handle:
-        for line in handle:
-            if line.startswith("from"): # ignore the header line
-                continue
-            
-            line = [ x.encode('utf8') for x in line.strip().split() ]
-            rates.append(line)
-    
-    return rates
+    return [ list(x) for x in _read_rates(path) ]
@@ -48,6 +48,44 @@ class RateLimiter:
             resp.raise_for_status()
             return await resp.read()
 
+    def get_cached(self, url):
+        ''' get cached data for a url, without requesting it if not cached
+
+        Args:
+            url: url to check the cache for
+
+        Returns:
+            cached data, or None if the url is not cached
+        '''
+        return self.get.lookup(url)
+
+    def set_cached(self, url, data):
+        ''' cache data for a url, for data obtained by other requests
+
+        Args:
+            url: url that get() would request the data from
+            data: response data, in bytes form
+        '''
+        self.get.store(url, data)
+
+    @retry(retries=9)
+    async def post(self, url, data, headers=None):
+        ''' perform asynchronous http post, with a JSON body
+
+        Args:
+            url: url to post to
+            data: JSON-serializable data to send as the request body
+            headers: http headers to pass in with the post query
+        '''
+        if not headers:
+            headers = {'content-type': 'application/json',
+                'accept': 'application/json'}
+        await self.wait_for_token()
+        async with self.client.post(url, json=data, headers=headers) as resp:
+            logging.info(f'{url}\t{resp.status}')
+            resp.raise_for_status()
+            return await resp.read()
+
     async def wait_for_token(self):
         ''' pause until tokens are refilled
         '''
@@ -1,5 +1,6 @@
 
 from pathlib import Path
+from collections import OrderedDict
 import asyncio
 import random
 import functools
@@ -8,25 +9,62 @@ import aiohttp
 
 from denovonear.ensembl_cache import EnsemblCache
 
-def ensembl_cache(folder=None):
+def ensembl_cache(folder=None, max_bytes=64 * 1024 * 1024):
     ''' store/retrive repeated ensembl requests from a persistent sqlite cache
+    
+    Recently used responses are also held in memory, since the same transcript
+    data is often requested several times within a run, and this avoids
+    querying and decompressing from the sqlite cache each time. The oldest
+    responses are dropped from memory once they exceed max_bytes in total.
+    
+    Args:
+        folder: path to folder for the sqlite cache
+        max_bytes: maximum total size of the responses held in memory
     '''
     if folder is None:
         folder = Path.home() / '.cache' / 'ensembl'
     cache = EnsemblCache(str(folder))
+    memory = OrderedDict()
+    size = 0
+    def remember(url, data):
+        nonlocal size
+        if url in memory:
+            size -= len(memory.pop(url))
+        if len(data) > max_bytes:
+            return
+        memory[url] = data
+        size += len(data)
+        while size > max_bytes:
+            _, old = memory.popitem(last=False)
+            size -= len(old)
+    def lookup(url):
+        if url in memory:
+            memory.move_to_end(url)
+            return memory[url]
+        cached = cache.get_cached_data(url)
+        if cached is not None:
+            remember(url, cached)
+        return cached
+    def store(url, data):
+        cache.cache_url_data(url, data)
+        remember(url, data)
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             url = args[1]
             if 'rest.ensembl.org' in url:
-                cached = cache.get_cached_data(url)
+                cached = lookup(url)
                 if cached is not None:
                     return cached
                 data = await func(*args, **kwargs)
-                cache.cache_url_data(url, data)
+                store(url, data)
                 return data
             else:
                 return await func(*args, **kwargs)
+        # let callers which fetch data by other routes (e.g. batched POST
+        # requests) share the cache, under the equivalent GET urls
+        wrapper.lookup = lookup
+        wrapper.store = store
         return wrapper
     return decorator
 
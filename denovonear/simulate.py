@@ -5,7 +5,8 @@ within the same gene.
 
 from denovonear.weights import geomean, get_distances, analyse_de_novos
 
-def get_p_value(transcript, rates, iterations, consequence, de_novos):
+def get_p_value(transcript, rates, iterations, consequence, de_novos, threads=1,
+        seed=None):
     """ find the probability of getting de novos with a mean conservation
     
     The probability is the number of simulations where the mean conservation
@@ -21,6 +22,9 @@ def get_p_value(transcript, rates, iterations, consequence, de_novos):
             "synonymous", "lof", "loss_of_function", "splice_lof",
             "splice_region".
         de_novos: list of de novos within a gene
+        threads: number of threads to run the simulations in.
+        seed: optional seed for the simulations, so the P value can be
+            reproduced (given the same number of threads).
     
     Returns:
         tuple of mean proximity for the observed de novos and probability of
@@ -36,13 +40,16 @@ def get_p_value(transcript, rates, iterations, consequence, de_novos):
         consequence = rename[consequence]
     
     weights = rates[consequence]
+    if seed is not None:
+        weights.seed(seed)
     
     cds_positions = [ transcript.get_coding_distance(x)['pos'] for x in de_novos ]
     distances = get_distances(cds_positions)
     observed = geomean(distances)
     
     # call a cython wrapped C++ library to handle the simulations
-    sim_prob = analyse_de_novos(weights, iterations, len(de_novos), observed)
+    sim_prob = analyse_de_novos(weights, iterations, len(de_novos), observed,
+        threads)
     
     observed = "{0:0.1f}".format(observed)
     
@@ -21,12 +21,15 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 from libcpp.string cimport string
+from libcpp.vector cimport vector
 
 cdef extern from "weighted_choice.h":
     cdef cppclass Chooser:
         Chooser() except +
+        void seed(unsigned long)
         void add_choice(int, double, string, string, int)
         AlleleChoice choice()
+        void choice_positions(vector[int] &)
         double get_summed_rate()
         int len()
         AlleleChoice iter(int)
@@ -25,9 +25,28 @@ from libcpp cimport bool
 from cython.operator cimport dereference as deref
 
 cdef class WeightedChoice:
-    def __cinit__(self):
+    def __cinit__(self, seed=None):
+        ''' construct a WeightedChoice object
+        
+        Args:
+            seed: optional seed for the random number generator. Each object
+                has an independent generator, so objects used in separate
+                threads or processes can be given different seeds for
+                reproducible, independent samples.
+        '''
         self.thisptr = new Chooser()
         self.pos = 0
+        
+        if seed is not None:
+            self.seed(seed)
+    
+    def seed(self, value):
+        ''' reseed the random number generator, for reproducible samples
+        
+        Args:
+            value: non-negative integer seed
+        '''
+        self.thisptr.seed(value)
     
     def __dealloc__(self):
         if self.thisptr is not NULL:
@@ -89,6 +108,25 @@ cdef class WeightedChoice:
         
         return self.choice_with_alleles()["pos"]
     
+    def choice_batch(self, int n):
+        """ chooses many random elements in one call
+        
+        Args:
+            n: number of elements to choose
+        
+        Returns:
+            list of the randomly selected elements (e.g. positions)
+        """
+        
+        if n < 0:
+            raise ValueError("can't choose a negative number of elements: {}".format(n))
+        
+        cdef vector[int] positions
+        positions.resize(n)
+        self.thisptr.choice_positions(positions)
+        
+        return positions
+    
     def choice_with_alleles(self):
         """ chooses a random element, but include alleles in output
         
@@ -108,12 +146,21 @@ cdef class WeightedChoice:
         return self.thisptr.get_summed_rate()
 
 cdef extern from "simulate.h":
+    void _stop_simulations(bool)
     vector[int] _get_distances(vector[int])
     bool _has_zero(vector[int])
     double _geomean(vector[int])
     bool _halt_permutation(double, int, double, double)
-    vector[double] _simulate_distribution(Chooser, int, int)
-    double _analyse_de_novos(Chooser, int, int, double)
+    vector[double] _simulate_distribution(Chooser, int, int) except + nogil
+    double _analyse_de_novos(Chooser, int, int, double, int) except + nogil
+
+def stop_simulations(stop=True):
+    """ stop running simulations early, or let new simulations run again
+    
+    analyse_de_novos() raises RuntimeError while simulations are stopped.
+    """
+    
+    _stop_simulations(stop)
 
 def get_distances(vector[int] positions):
     """ gets the distances between two or more CDS positions
@@ -146,13 +193,41 @@ def geomean(vector[int] distances):
     return _geomean(distances)
 
 def simulate_distribution(WeightedChoice choices, int iterations, int de_novos_count):
-    """
+    """ simulate mean distances between randomly sampled sites, without
+    holding the GIL
     """
     
-    return _simulate_distribution(deref(choices.thisptr), iterations, de_novos_count)
+    cdef vector[double] dist
+    with nogil:
+        dist = _simulate_distribution(deref(choices.thisptr), iterations, de_novos_count)
+    
+    return dist
 
-def analyse_de_novos(WeightedChoice choices, int iterations, int de_novos_count, double observed_value):
-    """
+def analyse_de_novos(WeightedChoice choices, int iterations, int de_novos_count,
+        double observed_value, int threads=1):
+    """ estimate the probability of the observed proximity from simulations
+    
+    The GIL is released while the simulations run, so simulations for separate
+    WeightedChoice objects can run in parallel threads.
+    
+    Args:
+        choices: WeightedChoice object to sample sites from
+        iterations: initial number of simulations to run
+        de_novos_count: number of de novos to sample per simulation
+        observed_value: mean distance between the observed de novos
+        threads: number of threads to split the simulations across. Leave
+            this at 1 if simulations are already being run in parallel.
+            Results for a seeded WeightedChoice depend on the thread count.
     """
     
-    return _analyse_de_novos(deref(choices.thisptr), iterations, de_novos_count, observed_value)
+    if iterations < 1:
+        raise ValueError("need at least one iteration: {}".format(iterations))
+    if threads < 1:
+        raise ValueError("need at least one thread: {}".format(threads))
+    
+    cdef double sim_prob
+    with nogil:
+        sim_prob = _analyse_de_novos(deref(choices.thisptr), iterations,
+            de_novos_count, observed_value, threads)
+    
+    return sim_prob
@@ -9,6 +9,11 @@ from Cython.Build import cythonize
 EXTRA_COMPILE_ARGS = ["-std=c++11"]
 EXTRA_LINK_ARGS = []
 
+# the simulations run in multiple threads
+if sys.platform != "win32":
+    EXTRA_COMPILE_ARGS += ["-pthread"]
+    EXTRA_LINK_ARGS += ["-pthread"]
+
 if sys.platform == "darwin":
     EXTRA_COMPILE_ARGS += ["-stdlib=libc++", "-mmacosx-version-min=10.9"]
     EXTRA_LINK_ARGS += ["-stdlib=libc++", "-mmacosx-version-min=10.9"]
@@ -1,11 +1,28 @@
 // #include <iostream>
 #include <algorithm>
+#include <atomic>
 #include <cmath>
+#include <stdexcept>
 #include <vector>
+#include <random>
+#include <thread>
 
 #include "weighted_choice.h"
 
-std::vector<int> _get_distances(std::vector<int> sites) {
+// set to stop running simulations early, e.g. when the calling program has
+// hit an error and won't use their results
+std::atomic<bool> stop_requested(false);
+
+void _stop_simulations(bool stop) {
+    /**
+        ask running simulations to stop early, or let simulations run again
+        
+        @stop whether simulations should stop
+    */
+    stop_requested = stop;
+}
+
+std::vector<int> _get_distances(const std::vector<int> & sites) {
     /**
         gets the distances between all the pairs of elements from a list
         
@@ -15,6 +32,7 @@ std::vector<int> _get_distances(std::vector<int> sites) {
     
     int len = sites.size();
     std::vector<int> distances;
+    distances.reserve(len * (len - 1) / 2);
     
     // get all non-repeating combinations of the sites
     for (int i=0; i < len; i++) {
@@ -28,7 +46,7 @@ std::vector<int> _get_distances(std::vector<int> sites) {
     return distances;
 }
 
-bool _has_zero(std::vector<int> distances) {
+bool _has_zero(const std::vector<int> & distances) {
     /**
         @check if any value in an vector is zero
         
@@ -39,7 +57,7 @@ bool _has_zero(std::vector<int> distances) {
     return std::find(distances.begin(), distances.end(), 0) != distances.end();
 }
 
-double _geomean(std::vector<int> distances) {
+double _geomean(const std::vector<int> & distances) {
     /**
         gets the geometric mean of a vector of distances
         
@@ -67,6 +85,42 @@ double _geomean(std::vector<int> distances) {
     return mean;
 }
 
+double _geomean_distance(const std::vector<int> & sites) {
+    /**
+        gets the geometric mean of the distances between all pairs of sites
+        
+        This matches _geomean(_get_distances(sites)), but without building the
+        vector of distances, since it is called for every simulated iteration.
+        
+        @sites vector of positions
+        @return geometric mean distance
+    */
+    int len = sites.size();
+    
+    // a zero distance only occurs when a site is repeated
+    bool zero_val = false;
+    for (int i=0; i < len && !zero_val; i++) {
+        for (int j=i+1; j < len; j++) {
+            if (sites[i] == sites[j]) { zero_val = true; break; }
+        }
+    }
+    
+    // sum the log10 distances in the same order as _get_distances()
+    double total = 0;
+    int adjust = (zero_val) ? 1 : 0;
+    for (int i=0; i < len; i++) {
+        for (int j=i+1; j < len; j++) {
+            total += log10(abs(sites[i] - sites[j]) + adjust);
+        }
+    }
+    
+    // calculate the mean value, and adjust back if we had a zero value
+    double mean = std::pow(10, total/(len * (len - 1) / 2.0));
+    if (zero_val) { mean -= 1; }
+    
+    return mean;
+}
+
 std::vector<double> _simulate_distribution(Chooser & choices, int iterations,
     int de_novo_count) {
     /**
@@ -80,20 +134,19 @@ std::vector<double> _simulate_distribution(Chooser & choices, int iterations,
     
     // use a vector to return the mean distances, easier to call from python
     std::vector<double> mean_distances;
+    mean_distances.reserve(iterations);
+    
+    // reuse the same buffer for the sampled sites in every iteration, rather
+    // than allocating a fresh vector each time
+    std::vector<int> positions(de_novo_count);
     
     // run through the required iterations
     for (int n=0; n < iterations; n++) {
         // randomly select de novo sites for the iteration
-        std::vector<int> positions;
-        for (int i=0; i < de_novo_count; i++) {
-            positions.push_back(choices.choice().pos);
-        }
-        
-        // convert the positions into distances between all pairs, and get the
-        // geometric mean distance of all the distances
-        std::vector<int> distances = _get_distances(positions);
+        choices.choice_positions(positions);
         
-        mean_distances.push_back(_geomean(distances));
+        // get the geometric mean distance between all pairs of positions
+        mean_distances.push_back(_geomean_distance(positions));
     }
     
     // make sure the mean distances are sorted, so we can quickly merge with
@@ -103,6 +156,93 @@ std::vector<double> _simulate_distribution(Chooser & choices, int iterations,
     return mean_distances;
 }
 
+int _count_at_most(const Chooser & choices, std::mt19937_64 & generator,
+    int iterations, int de_novo_count, double observed_value) {
+    /**
+        counts simulations with mean distances at most the observed distance
+        
+        This only needs the rank of the observed value, so it avoids storing
+        and sorting the simulated mean distances.
+        
+        @choices Chooser object, to sample sites
+        @generator random number generator to sample sites with
+        @iteration number of iterations to run
+        @de_novo_count number of de novos to simulate per iteration
+        @observed_value mean distance observed in the real de novo events
+        @return number of iterations with mean distance <= observed_value
+    */
+    
+    int count = 0;
+    std::vector<int> positions(de_novo_count);
+    for (int n=0; n < iterations; n++) {
+        // occasionally check whether the simulations should stop early
+        if (n % 10000 == 0 && stop_requested) { break; }
+        choices.choice_positions(positions, generator);
+        if (_geomean_distance(positions) <= observed_value) { count++; }
+    }
+    
+    return count;
+}
+
+int _count_at_most_threaded(Chooser & choices, int iterations,
+    int de_novo_count, double observed_value, int threads) {
+    /**
+        counts simulations at most the observed distance, split across threads
+        
+        The threads share the Chooser sites, but each has its own random
+        generator, seeded from the Chooser's generator. Results are reproducible
+        for a seeded Chooser and a given number of threads.
+        
+        @choices Chooser object, to sample sites
+        @iteration number of iterations to run
+        @de_novo_count number of de novos to simulate per iteration
+        @observed_value mean distance observed in the real de novo events
+        @threads maximum number of threads to use
+        @return number of iterations with mean distance <= observed_value
+    */
+    
+    // don't start threads for small numbers of iterations
+    int min_per_thread = 100000;
+    threads = std::max(1, std::min(threads, iterations / min_per_thread));
+    
+    std::vector<std::mt19937_64> generators;
+    for (int i=0; i < threads; i++) {
+        generators.emplace_back(choices.spawn_seed());
+    }
+    
+    if (threads == 1) {
+        return _count_at_most(choices, generators[0], iterations, de_novo_count,
+            observed_value);
+    }
+    
+    std::vector<int> counts(threads);
+    std::vector<std::thread> workers;
+    const Chooser & shared = choices;
+    try {
+        for (int i=0; i < threads; i++) {
+            int n = iterations / threads + (i < iterations % threads);
+            workers.emplace_back([&shared, &generators, &counts, i, n,
+                    de_novo_count, observed_value]() {
+                counts[i] = _count_at_most(shared, generators[i], n,
+                    de_novo_count, observed_value);
+            });
+        }
+    } catch (...) {
+        // finish any started threads before passing on the error (e.g. if we
+        // couldn't start another thread)
+        for (auto & worker : workers) { worker.join(); }
+        throw;
+    }
+    for (auto & worker : workers) {
+        worker.join();
+    }
+    
+    int count = 0;
+    for (auto x : counts) { count += x; }
+    
+    return count;
+}
+
 bool _halt_permutation(double p_val, int iterations, double z, double alpha) {
     /**
         halt permutations if the P value could never be significant
@@ -129,7 +269,7 @@ bool _halt_permutation(double p_val, int iterations, double z, double alpha) {
 }
 
 double _analyse_de_novos(Chooser & choices, int iterations, int de_novo_count,
-    double observed_value) {
+    double observed_value, int threads) {
     /**
         simulates de novos weighted by mutation rate
         
@@ -137,42 +277,41 @@ double _analyse_de_novos(Chooser & choices, int iterations, int de_novo_count,
         @iteration number of iterations to run
         @de_novo_count number of de novos to simulate per iteration
         @observed_value mean distance observed in the real de novo events
-        @return a list of mean distances for each iteration
+        @threads maximum number of threads to run simulations in
+        @return simulated P value for the observed mean distance. Raises
+            std::runtime_error if the simulations were stopped early.
     */
     
+    int max_iterations = 100000000;
     double minimum_prob = 1.0/(1.0 + static_cast<double>(iterations));
     double sim_prob = minimum_prob;
-    std::vector<double> dist;
+    int simulated = 0;
+    int count = 0;
     
-    while (iterations < 100000000 && sim_prob == minimum_prob) {
-        int iters_to_run = iterations - dist.size();
+    while (sim_prob == minimum_prob) {
+        int iters_to_run = iterations - simulated;
         
         minimum_prob = 1.0/(1.0 + static_cast<double>(iterations));
         
-        // simulate mean distances between de novos
-        std::vector<double> new_dist = _simulate_distribution(choices,
-            iters_to_run, de_novo_count);
-        
-        // merge the two sorted lists into a sorted vector
-        std::vector<double> v(iterations);
-        std::merge(dist.begin(), dist.end(), new_dist.begin(), new_dist.end(),
-            v.begin());
-        dist = v;
-        
-        // figure out where in the list a random probability would fall
-        std::vector<double>::iterator pos;
-        pos = std::upper_bound(dist.begin(), dist.end(), observed_value);
-        double position = pos - dist.begin();
+        // count the simulations at least as clustered as the observed de novos
+        count += _count_at_most_threaded(choices, iters_to_run, de_novo_count,
+            observed_value, threads);
+        if (stop_requested) { throw std::runtime_error("simulations stopped"); }
+        simulated = iterations;
         
-        // estimate the probability from the position
-        sim_prob = (1.0 + position)/(1.0 + dist.size());
+        // estimate the probability from the number of simulations at least as
+        // extreme as the observed value
+        sim_prob = (1.0 + count)/(1.0 + simulated);
         
         // halt permutations if the P value could never be significant
         double z = 10.0;
         double alpha = 0.1;
         if (_halt_permutation(sim_prob, iterations, z, alpha)) { break; }
         
-        iterations += 1000000;  // for if we need to run more iterations
+        // double the iterations if we need to run more, so that very small P
+        // values are reached in a few rounds, rather than one per million
+        if (iterations >= max_iterations) { break; }
+        iterations = std::min(iterations * 2, max_iterations);
     }
     
     return sim_prob;
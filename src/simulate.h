@@ -1,16 +1,23 @@
 #ifndef DENOVONEAR_SIMULATE_H_
 #define DENOVONEAR_SIMULATE_H_
 
+#include <random>
 #include <vector>
 
-std::vector<int> _get_distances(std::vector<int> sites);
-bool _has_zero(std::vector<int> distances);
-double _geomean(std::vector<int> distances);
+void _stop_simulations(bool stop);
+std::vector<int> _get_distances(const std::vector<int> & sites);
+bool _has_zero(const std::vector<int> & distances);
+double _geomean(const std::vector<int> & distances);
+double _geomean_distance(const std::vector<int> & sites);
 bool _halt_permutation(double p_val, int iterations, double z = 10.0,
     double alpha = 0.01);
 std::vector<double> _simulate_distribution(Chooser & choices,
     int iterations, int de_novo_count);
+int _count_at_most(const Chooser & choices, std::mt19937_64 & generator,
+    int iterations, int de_novo_count, double observed_value);
+int _count_at_most_threaded(Chooser & choices, int iterations,
+    int de_novo_count, double observed_value, int threads);
 double _analyse_de_novos(Chooser & choices, int iterations,
-    int de_novo_count, double observed_value);
+    int de_novo_count, double observed_value, int threads=1);
 
 #endif  // DENOVONEAR_SIMULATE_H_
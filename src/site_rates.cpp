@@ -6,6 +6,24 @@
 
 #include "site_rates.h"
 
+const char SitesChecks::bases[] = "ACGT";
+const char SitesChecks::complement[] = "TGCA";
+
+long _encode_kmer(const std::string & seq) {
+    /**
+        pack a DNA sequence into an integer, using two bits per base
+        
+        @returns packed sequence, or -1 if the sequence has non-ACGT bases
+    */
+    long code = 0;
+    for (auto base : seq) {
+        int value = _base_code(base);
+        if (value < 0) { return -1; }
+        code = (code << 2) | value;
+    }
+    return code;
+}
+
 Region _get_gene_range(Tx & tx) {
     /**
         get the lowest and highest positions of a transcripts coding sequence
@@ -20,7 +38,8 @@ Region _get_gene_range(Tx & tx) {
     return Region {start, end};
 }
 
-std::string _get_mutated_aa(Tx & tx, std::string base, std::string codon, int intra_codon) {
+std::string _get_mutated_aa(Tx & tx, const std::string & base,
+        std::string codon, int intra_codon) {
     /**
         find the amino acid resulting from a base change to a codon
         
@@ -41,17 +60,30 @@ std::string _get_mutated_aa(Tx & tx, std::string base, std::string codon, int in
 
 void SitesChecks::init(std::vector<std::vector<std::string>> mut) {
     
-    // convert the rates data to a nested map
-    for (auto line : mut) {
-        mut_dict[line[0]][line[1]] = std::stod(line[2]);
-    }
-    
     // calculate the length of sequences used in the mutation rate dictionary
     // This means we can flexibly use 3-mers, 5-mers, 7-mers etc if desired.
-    std::string str = mut_dict.begin()->first;
-    kmer_length = str.length();
+    kmer_length = mut[0][0].length();
     mid_pos = kmer_length/2;
     
+    // convert the rates data to a lookup table indexed by the encoded initial
+    // sequence and the alternate base, so we don't hash strings per site
+    use_dense = kmer_length <= 9;
+    if (use_dense) {
+        dense_rates.assign(1L << (2 * (kmer_length + 1)), 0.0);
+    }
+    for (auto line : mut) {
+        long initial = _encode_kmer(line[0]);
+        int alt = _base_code(line[1][mid_pos]);
+        if (initial < 0 || alt < 0) { continue; }
+        
+        long key = (initial << 2) | alt;
+        if (use_dense) {
+            dense_rates[key] = std::stod(line[2]);
+        } else {
+            sparse_rates[key] = std::stod(line[2]);
+        }
+    }
+    
     initialise_choices();
     // check the consequence alternates for each base in the coding sequence
     Region region = _get_gene_range(_tx);
@@ -60,11 +92,31 @@ void SitesChecks::init(std::vector<std::vector<std::string>> mut) {
     }
 }
 
+double SitesChecks::get_rate(long key) {
+    /**
+        get the mutation rate for an encoded sequence context and alternate base
+    */
+    if (use_dense) {
+        return dense_rates[key];
+    }
+    auto it = sparse_rates.find(key);
+    return (it == sparse_rates.end()) ? 0.0 : it->second;
+}
+
 void SitesChecks::initialise_choices() {
     // initialise a WeightedChoice object for each consequence category
-    for (auto category : categories) {
-        rates[category] = Chooser();
+    rates.assign(categories.size(), Chooser());
+}
+
+Chooser * SitesChecks::__getitem__(std::string category) {
+    /**
+        get the WeightedChoice object for a consequence category name
+    */
+    auto it = std::find(categories.begin(), categories.end(), category);
+    if (it == categories.end()) {
+        throw std::invalid_argument( "unknown consequence category: " + category );
     }
+    return &rates[it - categories.begin()];
 }
 
 std::string SitesChecks::check_consequence(std::string initial_aa,
@@ -73,32 +125,49 @@ std::string SitesChecks::check_consequence(std::string initial_aa,
          get the consequence of an amino acid change (or not)
      */
     
-    std::string cq = "synonymous";
+    // amino acids are single characters, and non-coding sites have none
+    char initial = (initial_aa.empty()) ? '\0' : initial_aa[0];
+    char mutated = (mutated_aa.empty()) ? '\0' : mutated_aa[0];
     
-    if ( initial_aa != "*" && mutated_aa == "*" ) {
+    return categories[classify(initial, mutated, _tx.in_coding_region(position))];
+}
+
+SitesChecks::Category SitesChecks::classify(char initial_aa, char mutated_aa,
+        bool in_coding) {
+    /**
+         get the consequence category of an amino acid change (or not)
+         
+         @initial_aa single character amino acid code, or '\0' if non-coding
+         @mutated_aa single character amino acid code, or '\0' if non-coding
+         @in_coding whether the variant lies within the CDS
+     */
+    
+    Category cq = SYNONYMOUS;
+    
+    if ( initial_aa != '*' && mutated_aa == '*' ) {
         // checks if two amino acids are a nonsense (eg stop_gained) mutation
-        cq = "nonsense";
-    } else if ( !_tx.in_coding_region(position) && boundary_dist < 3 ) {
+        cq = NONSENSE;
+    } else if ( !in_coding && boundary_dist < 3 ) {
         // check if a variant has a splice_donor or splice_acceptor consequence
         // These variants are defined as being the two intronic base-pairs
         // adjacent to the intron/exon boundary.
-        cq = "splice_lof";
+        cq = SPLICE_LOF;
     } else if ( initial_aa != mutated_aa ) {
         // include the site if it mutates to a different amino acid.
-        cq = "missense";
-    } else if (_tx.in_coding_region(position)) {
+        cq = MISSENSE;
+    } else if (in_coding) {
         if ( boundary_dist < 4) {
           // catch splice region variants within the exon, and in the appropriate
           // region of the intron (note that loss of function splice_donor and
           // splice_acceptor variants have been excluded when we spotted nonsense).
-          cq = "splice_region";
+          cq = SPLICE_REGION;
         }
     } else {
         if (boundary_dist < 9) {
             // check for splice_region_variant inside intron
-            cq = "splice_region";
+            cq = SPLICE_REGION;
         } else {
-            cq = "intronic";
+            cq = INTRONIC;
         }
     }
     
@@ -125,7 +194,10 @@ void SitesChecks::check_position(int bp) {
     }
     
     std::string seq = _tx.get_centered_sequence(bp, kmer_length);
-    boundary_dist = _tx.get_boundary_distance(bp);
+    // find whether the site is coding once, since the boundary distance, codon
+    // and consequence checks all depend on it
+    bool in_coding = _tx.in_coding_region(bp);
+    boundary_dist = _tx.get_boundary_distance(bp, in_coding);
     
     char fwd = '+';
     if (_tx.get_strand() != fwd) {
@@ -134,37 +206,50 @@ void SitesChecks::check_position(int bp) {
     
     Codon codon;
     try {
-        codon = _tx.get_codon_info(bp);
+        codon = _tx.get_codon_info(bp, in_coding);
     } catch ( const std::invalid_argument& e ) {
         return ;
     }
     
-    std::string initial_aa = codon.initial_aa;
+    char initial_aa = (codon.initial_aa.empty()) ? '\0' : codon.initial_aa[0];
     int cds_pos = codon.cds_pos;
     int offset = codon.offset;
     
-    // drop the initial base, since we want to mutate to other bases
-    std::vector<std::string> alts(bases);
-    alts.erase(std::find(alts.begin(), alts.end(), seq.substr(mid_pos, 1)));
+    // we can't mutate from an unknown reference base
+    int ref_code = _base_code(seq[mid_pos]);
+    if (ref_code < 0) {
+        return ;
+    }
+    
+    // sequence contexts with unknown bases have no mutation rate
+    long context = _encode_kmer(seq);
     
-    for (auto &alt : alts) {
-        std::string mutated_aa = initial_aa;
-        std::string alt_seq = seq.substr(0, mid_pos) + alt +
-            seq.substr(mid_pos + 1, kmer_length - mid_pos);
+    // figure out what the ref allele is, with respect to the + strand.
+    bool is_fwd = _tx.get_strand() == fwd;
+    std::string ref(1, is_fwd ? bases[ref_code] : complement[ref_code]);
+    
+    for (int alt_code=0; alt_code < 4; alt_code++) {
+        // skip the initial base, since we want to mutate to other bases
+        if (alt_code == ref_code) {
+            continue;
+        }
+        
+        std::string alt(1, bases[alt_code]);
+        char mutated_aa = initial_aa;
+        double rate = 0.0;
+        if (context >= 0) {
+            rate = get_rate((context << 2) | alt_code);
+        }
         
-        double rate = mut_dict[seq][alt_seq];
-        if ( initial_aa != "" ) {
-            mutated_aa = _get_mutated_aa(_tx, alt, codon.codon_seq, codon.intra_codon);
+        if ( initial_aa != '\0' ) {
+            mutated_aa = _get_mutated_aa(_tx, alt, codon.codon_seq, codon.intra_codon)[0];
         }
         
-        std::string category = check_consequence(initial_aa, mutated_aa, bp);
+        Category category = classify(initial_aa, mutated_aa, in_coding);
         
-        // figure out what the ref and alt alleles are, with respect to
-        // the + strand.
-        std::string ref = seq.substr(mid_pos, 1);
-        if (_tx.get_strand() != fwd) {
-            ref = transdict[ref];
-            alt = transdict[alt];
+        // the alt allele is also given with respect to the + strand
+        if (!is_fwd) {
+            alt[0] = complement[alt_code];
         }
         
         if (use_cds_coords) {
@@ -173,8 +258,8 @@ void SitesChecks::check_position(int bp) {
             rates[category].add_choice(bp, rate, ref, alt, 0);
         }
         
-        if (category == "nonsense" || category == "splice_lof") {
-            rates["loss_of_function"].add_choice(cds_pos, rate, ref, alt, offset);
+        if (category == NONSENSE || category == SPLICE_LOF) {
+            rates[LOSS_OF_FUNCTION].add_choice(cds_pos, rate, ref, alt, offset);
         }
     }
 }
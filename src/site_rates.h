@@ -18,16 +18,25 @@ class SitesChecks {
     defined at: http://www.ensembl.org/info/genome/variation/predicted_data.html
     */
     
-    std::unordered_map<std::string, std::unordered_map<std::string, double>> mut_dict;
-    std::unordered_map<std::string, Chooser> rates;
+    // mutation rates indexed by the 2-bit encoded sequence context, with the
+    // alternate base in the lowest two bits. Short contexts use a dense
+    // table, but long contexts would need too large a table, so fall back to
+    // a sparse map.
+    std::vector<double> dense_rates;
+    std::unordered_map<long, double> sparse_rates;
+    bool use_dense = true;
+    // consequence categories, which index the choosers in 'rates', and the
+    // matching names in 'categories'
+    enum Category { MISSENSE, NONSENSE, SYNONYMOUS, SPLICE_LOF, SPLICE_REGION,
+        LOSS_OF_FUNCTION, INTRONIC };
+    std::vector<Chooser> rates;
     int boundary_dist;
     int kmer_length;
     int mid_pos;
     
-    std::unordered_map<std::string, std::string> transdict = {
-        {"A", "T"}, {"T", "A"}, {"G", "C"}, {"C", "G"}};
-    
-    std::vector<std::string> bases = {"A", "C", "G", "T"};
+    // bases in order of their 2-bit codes, and the complement of each
+    static const char bases[];
+    static const char complement[];
     std::vector<std::string> categories = {"missense", "nonsense", "synonymous",
         "splice_lof", "splice_region", "loss_of_function", "intronic"};
 
@@ -36,7 +45,7 @@ class SitesChecks {
          _tx { tx }, use_cds_coords { cds_coords } { init(mut); };
     SitesChecks(Tx tx, std::vector<std::vector<std::string>> mut, bool cds_coords, Tx mask) :
          _tx { tx }, masked { mask }, use_cds_coords { cds_coords } { has_mask = true; init(mut); };
-    Chooser * __getitem__(std::string category) { return &rates[category]; };
+    Chooser * __getitem__(std::string category);
     void initialise_choices();
     
     void check_position(int bp);
@@ -46,11 +55,15 @@ class SitesChecks {
     Tx _tx;
     Tx masked = Tx("zz", "z", -100, -100, '+');
     void init(std::vector<std::vector<std::string>> mut);
+    double get_rate(long key);
+    Category classify(char initial_aa, char mutated_aa, bool in_coding);
     bool has_mask = false;
     bool use_cds_coords = true;
 };
 
+long _encode_kmer(const std::string & seq);
 Region _get_gene_range(Tx & tx);
-std::string _get_mutated_aa(Tx & tx, std::string base, std::string codon, int intra_codon);
+std::string _get_mutated_aa(Tx & tx, const std::string & base,
+    std::string codon, int intra_codon);
 
 #endif  // DENOVONEAR_SITESCHECKS_H_
@@ -8,6 +8,9 @@
 
 #include "tx.h"
 
+const char Tx::aa_code[] =
+    "KNKNTTTTRSRSIIMIQHQHPPPPRRRRLLLLEDEDAAAAGGGGVVVV*Y*YSSSS*CWCLFLF";
+
 Tx::Tx(std::string transcript_id, std::string chromosome,
     int start_pos, int end_pos, char strand) {
     /**
@@ -194,7 +197,7 @@ int Tx::closest_exon_num(int pos) {
     return closest_exon_num(pos, exons);
 }
 
-int Tx::closest_exon_num(int pos, std::vector<Region> group) {
+int Tx::closest_exon_num(int pos, const std::vector<Region> & group) {
     /**
         find the index for the closest exon/CDS to a chromosome position
         
@@ -206,7 +209,9 @@ int Tx::closest_exon_num(int pos, std::vector<Region> group) {
     int size = group.size();
     if (idx == 0) {
         return idx;
-    } else if (idx == size and pos > group[idx - 1].end) {
+    } else if (idx == size) {
+        // the position is after the start of the final region, so the final
+        // region is the closest, whether or not the position lies within it
         return idx - 1;
     }
     
@@ -595,33 +600,40 @@ std::string Tx::translate(std::string seq) {
     std::string protein;
     int n = 3;
     int len = seq.size();
-    std::string codon;
+    protein.reserve(len / n + 1);
     
     for ( int i=0; i < len; i=i+n ) {
-        codon = seq.substr(i, n);
+        // pack the codon into 2 bits per base, to index the amino acid table
+        int key = 0;
+        bool valid = i + n <= len;
+        for ( int j=i; valid && j < i + n; j++ ) {
+            int base = _base_code(seq[j]);
+            valid = base >= 0;
+            key = (key << 2) | base;
+        }
         
-        if (aa_code.count(codon) == 0) {
-            std::string msg = "cannot translate codon: " + codon;
+        if (!valid) {
+            std::string msg = "cannot translate codon: " + seq.substr(i, n);
             throw std::invalid_argument( msg );
         }
         
-        protein += aa_code[codon];
+        protein += aa_code[key];
     }
     
     return protein;
 }
 
-Codon Tx::get_codon_info(int bp) {
+Codon Tx::get_codon_info(int bp, bool in_coding) {
     /**
         get the details of the codon which a variant resides in
         
         @bp nucleotide position of the variant (within the transcript gene range)
+        @in_coding whether the variant lies within the CDS
     
         @returns dictionary of codon sequence, cds position, amino acid that the
             codon translates to, and position within the codon.
     */
     
-    bool in_coding = in_coding_region(bp);
     CDS_coords site = get_coding_distance(bp);
     
     if ((site.position < 0) | (site.position > cds_length)) {
@@ -635,23 +647,23 @@ Codon Tx::get_codon_info(int bp) {
     std::string codon_seq = "";
     std::string initial_aa = "";
     
-    CDS_coords cds_pos = get_coding_distance(bp);
     if (in_coding) {
-        codon_number = get_codon_number_for_cds_position(cds_pos.position);
-        intra_codon = get_position_within_codon(cds_pos.position);
+        codon_number = get_codon_number_for_cds_position(site.position);
+        intra_codon = get_position_within_codon(site.position);
         codon_seq = get_codon_sequence(codon_number);
         initial_aa = translate(codon_seq);
     }
     
-    return Codon {cds_pos.position, codon_seq, intra_codon, codon_number,
-        initial_aa, cds_pos.offset};
+    return Codon {site.position, codon_seq, intra_codon, codon_number,
+        initial_aa, site.offset};
 }
 
-int Tx::get_boundary_distance(int bp) {
+int Tx::get_boundary_distance(int bp, bool in_coding) {
     /**
         get the distance in bp for a variant to the nearest exon boundary
         
         @bp nucleotide position of the variant (within the transcript gene range)
+        @in_coding whether the variant lies within the CDS
         @returns distance in base-pairs to the nearest exon boundary.
     */
     
@@ -661,7 +673,7 @@ int Tx::get_boundary_distance(int bp) {
     // sites within the coding region are actually one bp further away,
     // since we are measuring the distance to the base inside the exon
     // boundary
-    if ( in_coding_region(bp) ) {
+    if ( in_coding ) {
         distance += 1;
     }
     
@@ -781,6 +793,20 @@ int min_len(std::string a, std::string b) {
     return std::min(a.size(), b.size());
 }
 
+int _base_code(char base) {
+    /**
+        convert a DNA base to a 2-bit code (A=0, C=1, G=2, T=3), or -1 for
+        anything else (e.g. N)
+    */
+    switch (base) {
+        case 'A': return 0;
+        case 'C': return 1;
+        case 'G': return 2;
+        case 'T': return 3;
+        default: return -1;
+    }
+}
+
 void Tx::trim_alleles(int& start, int& end, std::string& alt) {
     /* realign alt against ref sequence, and strip down to alternate bases
     */
@@ -25,6 +25,7 @@ struct Codon {
 };
 
 int min_len(std::string a, std::string b);
+int _base_code(char base);
 
 class Tx {
     std::string name;
@@ -45,23 +46,9 @@ class Tx {
         {'a', 't'}, {'c', 'g'}, {'g', 'c'}, {'t', 'a'}, {'u', 'a'},
         {'A', 'T'}, {'C', 'G'}, {'G', 'C'}, {'T', 'A'}, {'U', 'A'}};
     
-    std::unordered_map<std::string, std::string> aa_code = {
-        {"AAA", "K"}, {"AAC", "N"}, {"AAG", "K"}, {"AAT", "N"},
-        {"ACA", "T"}, {"ACC", "T"}, {"ACG", "T"}, {"ACT", "T"},
-        {"AGA", "R"}, {"AGC", "S"}, {"AGG", "R"}, {"AGT", "S"},
-        {"ATA", "I"}, {"ATC", "I"}, {"ATG", "M"}, {"ATT", "I"},
-        {"CAA", "Q"}, {"CAC", "H"}, {"CAG", "Q"}, {"CAT", "H"},
-        {"CCA", "P"}, {"CCC", "P"}, {"CCG", "P"}, {"CCT", "P"},
-        {"CGA", "R"}, {"CGC", "R"}, {"CGG", "R"}, {"CGT", "R"},
-        {"CTA", "L"}, {"CTC", "L"}, {"CTG", "L"}, {"CTT", "L"},
-        {"GAA", "E"}, {"GAC", "D"}, {"GAG", "E"}, {"GAT", "D"},
-        {"GCA", "A"}, {"GCC", "A"}, {"GCG", "A"}, {"GCT", "A"},
-        {"GGA", "G"}, {"GGC", "G"}, {"GGG", "G"}, {"GGT", "G"},
-        {"GTA", "V"}, {"GTC", "V"}, {"GTG", "V"}, {"GTT", "V"},
-        {"TAA", "*"}, {"TAC", "Y"}, {"TAG", "*"}, {"TAT", "Y"},
-        {"TCA", "S"}, {"TCC", "S"}, {"TCG", "S"}, {"TCT", "S"},
-        {"TGA", "*"}, {"TGC", "C"}, {"TGG", "W"}, {"TGT", "C"},
-        {"TTA", "L"}, {"TTC", "F"}, {"TTG", "L"}, {"TTT", "F"}};
+    // amino acids for each codon, indexed by the 2-bit encoded codon (so
+    // AAA, AAC, AAG, AAT, ACA, ... TTT)
+    static const char aa_code[];
     
     std::unordered_map<int, int> exon_to_cds;
     void _cache_exon_cds_positions();
@@ -93,7 +80,7 @@ class Tx {
     
     bool is_exonic(int pos);
     int closest_exon_num(int pos);
-    int closest_exon_num(int pos, std::vector<Region> group);
+    int closest_exon_num(int pos, const std::vector<Region> & group);
     Region get_closest_exon(int pos);
     bool in_coding_region(int pos);
     CDS_coords to_closest_exon(int pos);
@@ -116,8 +103,10 @@ class Tx {
     std::string get_codon_sequence(int codon_number);
     std::string translate(std::string seq);
     
-    Codon get_codon_info(int bp);
-    int get_boundary_distance(int bp);
+    Codon get_codon_info(int bp) { return get_codon_info(bp, in_coding_region(bp)); };
+    Codon get_codon_info(int bp, bool in_coding);
+    int get_boundary_distance(int bp) { return get_boundary_distance(bp, in_coding_region(bp)); };
+    int get_boundary_distance(int bp, bool in_coding);
     
     std::string consequence(int start, int end, std::string alt);
 };
@@ -22,7 +22,8 @@ void Chooser::reset_sampler() {
     dist = temp;
 }
 
-void Chooser::add_choice(int site, double prob, std::string ref, std::string alt, int offset) {
+void Chooser::add_choice(int site, double prob, const std::string & ref,
+        const std::string & alt, int offset) {
      /**
         adds another choice to the class object
         
@@ -43,6 +44,19 @@ void Chooser::add_choice(int site, double prob, std::string ref, std::string alt
     reset_sampler();
 }
 
+int Chooser::sample_index() {
+    /**
+        find the index of a randomly sampled site, weighted by site probability
+    */
+    
+    // get a random float between 0 and the cumulative sum
+    double number = dist(generator);
+    
+    // figure out where in the list a random probability would fall
+    auto pos = std::lower_bound(cumulative.begin(), cumulative.end(), number);
+    return pos - cumulative.begin();
+}
+
 AlleleChoice Chooser::choice() {
     /**
         chooses a random element using a set of probability weights
@@ -54,17 +68,39 @@ AlleleChoice Chooser::choice() {
         return AlleleChoice {-1, "N", "N", 0.0, 0};
     }
     
-    // get a random float between 0 and the cumulative sum
-    double number = dist(generator);
+    return sites[sample_index()];
+}
+
+void Chooser::choice_positions(std::vector<int> & positions,
+        std::mt19937_64 & gen) const {
+    /**
+        fill a vector with randomly chosen site positions
+        
+        This draws a batch of sites in one call, so the checks for an empty
+        Chooser happen once per batch, rather than once per site. Only the
+        positions are returned, which avoids copying the allele strings when
+        sampling millions of sites in the simulations. This doesn't modify the
+        Chooser, so threads can share one Chooser, if each has its own random
+        generator.
+        
+        @positions vector to fill, sites are drawn for every element
+        @gen random number generator to draw with
+    */
     
-    // figure out where in the list a random probability would fall
-    auto pos = std::lower_bound(cumulative.begin(), cumulative.end(), number);
-    int offset = pos - cumulative.begin();
+    if (cumulative.empty()) {
+        std::fill(positions.begin(), positions.end(), -1);
+        return;
+    }
     
-    return sites[offset];
+    std::uniform_real_distribution<double> sampler(0.0, get_summed_rate());
+    for (auto & pos : positions) {
+        double number = sampler(gen);
+        auto idx = std::lower_bound(cumulative.begin(), cumulative.end(), number);
+        pos = sites[idx - cumulative.begin()].pos;
+    }
 }
 
-double Chooser::get_summed_rate() {
+double Chooser::get_summed_rate() const {
     /**
         gets the cumulative sum for all the current choices.
     */
@@ -72,10 +108,15 @@ double Chooser::get_summed_rate() {
     return (sites.empty()) ? 0.0 : cumulative.back() ;
 }
 
-void Chooser::append(Chooser other) {
+void Chooser::append(const Chooser & other) {
+    /**
+        append the sites from another Chooser, without copying the other object
+    */
     
     double current = get_summed_rate();
     int len = other.sites.size();
+    cumulative.reserve(cumulative.size() + len);
+    sites.reserve(sites.size() + len);
     for (int i=0; i < len; i++) {
         cumulative.push_back(other.cumulative[i] + current);
         sites.push_back(other.sites[i]);
@@ -21,15 +21,21 @@ class Chooser {
     std::uniform_real_distribution<double> dist;
     std::mt19937_64 generator;
     void reset_sampler();
+    int sample_index();
 
  public:
     Chooser();
-    void add_choice(int site, double prob, std::string ref="N", std::string alt="N", int offset=0);
+    void seed(unsigned long value) { generator.seed(value); };
+    unsigned long spawn_seed() { return generator(); };
+    void add_choice(int site, double prob, const std::string & ref="N",
+        const std::string & alt="N", int offset=0);
     AlleleChoice choice();
-    double get_summed_rate();
+    void choice_positions(std::vector<int> & positions) { choice_positions(positions, generator); };
+    void choice_positions(std::vector<int> & positions, std::mt19937_64 & gen) const;
+    double get_summed_rate() const;
     int len() { return sites.size() ;};
     AlleleChoice iter(int pos) { return sites[pos]; };
-    void append(Chooser other);
+    void append(const Chooser & other);
 };
 
 #endif  // DENOVONEAR_WEIGHTED_CHOICE_H_
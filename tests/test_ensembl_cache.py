@@ -34,8 +34,10 @@ from threading import Thread, Event
 import random
 import hashlib
 import time
+import asyncio
 
 from denovonear.ensembl_cache import EnsemblCache
+from denovonear.rate_limiter_retries import ensembl_cache
 
 IS_PYTHON2 = sys.version_info[0] == 2
 IS_PYTHON3 = sys.version_info[0] == 3
@@ -120,6 +122,43 @@ class TestEnsemblCachePy(unittest.TestCase):
         self.cache.cache_url_data(url, temp_data)
         self.assertIsNotNone(self.cache.get_cached_data(url))
     
+    def test_ensembl_cache_memory(self):
+        """ check the ensembl_cache decorator holds recent responses in memory
+        """
+        
+        folder = os.path.join(self.temp_dir, 'memory')
+        first = "http://rest.ensembl.org/feature/id/temp3?feature=exon"
+        second = "http://rest.ensembl.org/feature/id/temp4?feature=exon"
+        third = "http://rest.ensembl.org/feature/id/temp5?feature=exon"
+        responses = {first: b"aaaaa", second: b"bbbbb", third: b"cccccc"}
+        requested = []
+        
+        @ensembl_cache(folder, max_bytes=10)
+        async def get(self, url):
+            requested.append(url)
+            return responses[url]
+        
+        fetch = lambda url: asyncio.get_event_loop().run_until_complete(get(None, url))
+        
+        # a miss requests the data
+        self.assertEqual(fetch(first), b"aaaaa")
+        self.assertEqual(requested, [first])
+        
+        # change the data in the sqlite cache, so we can tell whether data
+        # came from memory or from the sqlite cache
+        EnsemblCache(folder).cache_url_data(first, b"zzzzz")
+        
+        # a hit returns the data from memory, without another request
+        self.assertEqual(fetch(first), b"aaaaa")
+        self.assertEqual(requested, [first])
+        
+        # adding more data than fits in memory evicts the oldest responses, so
+        # those come from the sqlite cache instead
+        fetch(second)
+        fetch(third)
+        self.assertEqual(fetch(first), b"zzzzz")
+        self.assertEqual(requested, [first, second, third])
+    
     def test_cache_load(self):
         """ make sure the cache can handle a reasonable load
     
@@ -14,8 +14,8 @@ from denovonear.rate_limiter import RateLimiter
 from denovonear.ensembl_requester import (get_genes_for_hgnc_id,
     get_transcript_ids_for_ensembl_gene_id, get_previous_symbol,
     get_genomic_seq_for_transcript, get_cds_seq_for_transcript,
-    get_protein_seq_for_transcript, get_exon_ranges_for_transcript,
-    get_cds_ranges_for_transcript)
+    get_protein_seq_for_transcript, get_protein_seqs_for_transcripts,
+    get_exon_ranges_for_transcript, get_cds_ranges_for_transcript)
 
 async def call(func, *args, **kwargs):
     ''' call ensembl rest API function
@@ -120,6 +120,15 @@ class TestEnsemblRequestPy(unittest.TestCase):
             'HLMVVTLLFGTALFVYLRPSSSYLLGRDKVVSVFYSLVIPMLNPLIYSLRNKEIKDALWKVLERKK'
             'VFS')
     
+    def test_get_protein_seqs_for_transcripts(self):
+        """ test that get_protein_seqs_for_transcripts() works correctly
+        """
+        
+        tx_id = "ENST00000302030"
+        seqs = _run(get_protein_seqs_for_transcripts, [tx_id])
+        self.assertEqual(list(seqs), [tx_id])
+        self.assertEqual(seqs[tx_id], _run(get_protein_seq_for_transcript, tx_id))
+    
     def test_get_exon_ranges_for_transcript(self):
         """ test that get_exon_ranges_for_transcript() works correctly
         """
@@ -26,7 +26,7 @@ from pathlib import Path
 
 from denovonear.load_gene import get_transcript_lengths, construct_gene_object, \
     get_de_novos_in_transcript, get_transcript_ids, load_gene, \
-    count_de_novos_per_transcript, minimise_transcripts
+    count_de_novos_per_transcript, minimise_transcripts, pick_minimal_transcripts
 from denovonear.transcript import Transcript
 from denovonear.rate_limiter import RateLimiter
 
@@ -234,3 +234,19 @@ class TestLoadGenePy(unittest.TestCase):
         # check that when none of the de novos are in a transcript, we return
         # an empty list.
         self.assertEqual(_run(minimise_transcripts, hgnc, [100]), {})
+    
+    def test_pick_minimal_transcripts(self):
+        """ test that pick_minimal_transcripts() works with constructed transcripts
+        """
+        
+        tx_id = 'ENST00000242577'
+        lengths = {tx_id: 89}
+        genes = {tx_id: self.set_transcript()}
+        
+        sites = [120934226, 120936012]
+        self.assertEqual(pick_minimal_transcripts(lengths, genes, sites),
+            {tx_id: {'len': 89, 'n': 2}})
+        
+        # de novos outside the transcripts, or no de novos, give no transcripts
+        self.assertEqual(pick_minimal_transcripts(lengths, genes, [100]), {})
+        self.assertEqual(pick_minimal_transcripts(lengths, genes, []), {})
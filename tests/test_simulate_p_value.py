@@ -73,6 +73,18 @@ class TestGetPValuePy(unittest.TestCase):
         self.assertTrue(p_value < 0.04)
         self.assertEqual(obs, '0.0')
     
+    def test_get_p_value_seeded(self):
+        """ check that seeded simulations give reproducible P values
+        """
+        
+        iterations = 10000
+        cq = 'missense'
+        de_novos = [5, 10]
+        
+        first = get_p_value(self.transcript, self.rates, iterations, cq, de_novos, seed=1)
+        second = get_p_value(self.transcript, self.rates, iterations, cq, de_novos, seed=1)
+        self.assertEqual(first, second)
+    
     def test_get_p_value_nonsignificant(self):
         """ check for de novos spread across the gene
         """
@@ -20,10 +20,11 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 import math
+import threading
 import unittest
 
 from denovonear.weights import get_distances, geomean, WeightedChoice, \
-    analyse_de_novos, simulate_distribution
+    analyse_de_novos, simulate_distribution, stop_simulations
 
 class TestSimulationsPy(unittest.TestCase):
     """ unit test the simulation functions
@@ -67,6 +68,72 @@ class TestSimulationsPy(unittest.TestCase):
         
         self.assertAlmostEqual(p_val, 0.002, places=3)
     
+    def test_analyse_de_novos_threaded(self):
+        """ test analyse_de_novos() works correctly with multiple threads
+        """
+        
+        positions = [100, 110, 120]
+        observed = geomean(get_distances(positions))
+        
+        def analyse(seed, threads):
+            choices = WeightedChoice(seed=seed)
+            for x in range(1000):
+                choices.add_choice(x, 0.0001)
+            return analyse_de_novos(choices, 1000000, len(positions), observed,
+                threads=threads)
+        
+        # splitting the simulations across threads gives the expected P value,
+        # and seeded objects give the same P value for the same thread count
+        p_val = analyse(1, 4)
+        self.assertAlmostEqual(p_val, 0.002, places=3)
+        self.assertEqual(p_val, analyse(1, 4))
+        
+        with self.assertRaises(ValueError):
+            analyse(1, 0)
+    
+    def test_analyse_de_novos_iterations(self):
+        """ test analyse_de_novos() runs more iterations for small P values
+        """
+        
+        # all sampled de novos fall on one site, so no simulation is as close
+        # as a negative distance, and the P value stays at its floor. The
+        # iterations double from 3 until capped at 100 million.
+        choices = WeightedChoice(seed=1)
+        choices.add_choice(10, 1.0)
+        p_val = analyse_de_novos(choices, 3, 2, -1.0)
+        self.assertEqual(p_val, 1 / (1 + 100000000))
+        
+        # a run needs at least one iteration
+        with self.assertRaises(ValueError):
+            analyse_de_novos(self.choices, 0, 3, 5.0)
+    
+    def test_stop_simulations(self):
+        """ test that stop_simulations() stops running simulations early
+        """
+        
+        # this would run 100 million iterations if it weren't stopped
+        choices = WeightedChoice(seed=1)
+        choices.add_choice(10, 1.0)
+        errors = []
+        def analyse():
+            try:
+                analyse_de_novos(choices, 1000000, 2, -1.0)
+            except RuntimeError as error:
+                errors.append(error)
+        
+        thread = threading.Thread(target=analyse)
+        thread.start()
+        try:
+            stop_simulations()
+            thread.join()
+        finally:
+            stop_simulations(False)
+        self.assertEqual(len(errors), 1)
+        
+        # simulations run again once they are allowed to
+        self.assertAlmostEqual(analyse_de_novos(self.choices, 10000, 3, 5.0),
+            0.0, places=2)
+    
     def test_simulate_distribution(self):
         ''' check that simulate_distribution works correctly
         '''
@@ -182,6 +182,10 @@ class TestSiteRatesPy(unittest.TestCase):
         self.assertAlmostEqual(wts["loss_of_function"].get_summed_rate(), 6.5e-06, places=7)
         self.assertAlmostEqual(wts["splice_lof"].get_summed_rate(), 6e-06, places=7)
         self.assertAlmostEqual(wts["splice_region"].get_summed_rate(), 2.05e-05, places=7)
+        
+        # unknown consequence types raise an error
+        with self.assertRaises(ValueError):
+            wts["stop_gained"]
     
     def test_site_rates_sampled(self):
         """ check the sites sampled for each consequence group.
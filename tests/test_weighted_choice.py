@@ -103,6 +103,41 @@ class TestWeightedChoicePy(unittest.TestCase):
         # check that all the choices have been made from the inserted values
         self.assertEqual(set(s), set([1, 2, 3]))
     
+    def test_choice_batch(self):
+        """ test that choice_batch() works correctly
+        """
+        
+        # an object without any choices returns -1 for every choice
+        choices = WeightedChoice()
+        self.assertEqual(choices.choice_batch(3), [-1, -1, -1])
+        
+        choices.add_choice(1, 1)
+        choices.add_choice(2, 5)
+        self.assertEqual(choices.choice_batch(0), [])
+        
+        # batches are sampled at the expected proportions
+        s = choices.choice_batch(1000000)
+        self.assertEqual(len(s), 1000000)
+        self.assertEqual(set(s), set([1, 2]))
+        self.assertAlmostEqual(s.count(1)/len(s), 0.1667, places=2)
+        
+        with self.assertRaises(ValueError):
+            choices.choice_batch(-1)
+    
+    def test_choice_seeded(self):
+        """ test that seeded WeightedChoice objects give reproducible samples
+        """
+        
+        def sample(seed):
+            choices = WeightedChoice(seed=seed)
+            for x in range(100):
+                choices.add_choice(x, 1)
+            return [ choices.choice() for x in range(100) ]
+        
+        # the same seed gives the same samples, different seeds differ
+        self.assertEqual(sample(1), sample(1))
+        self.assertNotEqual(sample(1), sample(2))
+    
     def test_choice_small_numbers(self):
         """ test that choice() works correctly.
         """